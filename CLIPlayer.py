@@ -3,26 +3,78 @@ import vlc
 import os
 import sys
 import random
+import atexit
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
 
 class AudioPlayer:
     """Класс для управления аудио через VLC"""
     def __init__(self):
-        self.instance = vlc.Instance()
-        self.player = self.instance.media_player_new()
+        # VLC создается при первой загрузке файла: загрузка плагинов занимает время
+        self.instance = None
+        self.player = None
         self.current_file = None
+        self.current_basename = None
         self.paused = False
         self.volume = 50  # Громкость от 0 до 100
         self.repeat = False
         self.shuffle = False
-        self.playlist = []
+        self.playlist = []  # исходный порядок, не изменяется
+        self.order = []  # порядок воспроизведения: индексы в playlist
         self.current_index = 0
+        self._ended = False  # выставляется из потока VLC по окончании трека
+        self._playing = False  # обновляется по событиям VLC, без вызова is_playing()
+        self._pending_seek = 0  # накопленная перемотка (сек)
+
+    def _init_backend(self):
+        """Ленивая инициализация VLC"""
+        if self.instance is None:
+            self.instance = vlc.Instance()
+            self.player = self.instance.media_player_new()
+            events = self.player.event_manager()
+            events.event_attach(vlc.EventType.MediaPlayerEndReached, self._on_end_reached)
+            events.event_attach(vlc.EventType.MediaPlayerPlaying, self._on_state_changed, True)
+            for event_type in (vlc.EventType.MediaPlayerPaused,
+                               vlc.EventType.MediaPlayerStopped,
+                               vlc.EventType.MediaPlayerEncounteredError):
+                events.event_attach(event_type, self._on_state_changed, False)
+            atexit.register(self.release)
+
+    def _on_state_changed(self, event, playing):
+        """Колбэк VLC: смена состояния воспроизведения"""
+        self._playing = playing
+
+    def _on_end_reached(self, event):
+        """Колбэк VLC: только отмечаем событие, управлять плеером отсюда нельзя"""
+        self._playing = False
+        self._ended = True
+
+    def poll_events(self):
+        """Обработка событий с прошлого вызова: возвращает файл для загрузки или None"""
+        if not self._ended:
+            return None
+        self._ended = False
+        if self.repeat:
+            return self.current_file
+        return self.next_file()
+
+    def release(self):
+        """Освобождение ресурсов VLC"""
+        if self.instance is not None:
+            self.player.release()
+            self.instance.release()
+            self.instance = None
+            self.player = None
 
     def load(self, filename):
         """Загрузка файла"""
         try:
+            self._init_backend()
             media = self.instance.media_new(filename)
             self.player.set_media(media)
             self.current_file = filename
+            self.current_basename = os.path.basename(filename)
             self.player.audio_set_volume(self.volume)
             return True
         except Exception as e:
@@ -31,70 +83,244 @@ class AudioPlayer:
 
     def play(self):
         """Начать воспроизведение"""
-        if self.player.get_media():
+        if self.player and self.player.get_media():
             self.player.play()
+            self._playing = True
             self.paused = False
 
     def pause(self):
         """Поставить на паузу"""
-        if self.player.is_playing():
+        if self.is_playing():
             self.player.pause()
+            self._playing = False
             self.paused = True
 
     def stop(self):
         """Остановить воспроизведение"""
-        self.player.stop()
+        if self.player:
+            self.player.stop()
+        self._playing = False
         self.paused = False
 
     def is_playing(self):
         """Проверка состояния воспроизведения"""
-        return self.player.is_playing()
+        return self._playing and not self.paused
 
     def set_volume(self, volume):
-        """Установка громкости (0-100)"""
-        self.volume = max(0, min(100, volume))
-        self.player.audio_set_volume(self.volume)
+        """Установка громкости (0-100), возвращает True, если она изменилась"""
+        volume = max(0, min(100, volume))
+        if volume == self.volume:
+            return False
+        self.volume = volume
+        if self.player:
+            self.player.audio_set_volume(self.volume)
+        return True
 
     def seek(self, seconds):
-        """Перемотка (в секундах)"""
-        if self.player.get_media():
+        """Перемотка (в секундах), применяется в apply_seek"""
+        self._pending_seek += seconds
+
+    def apply_seek(self):
+        """Применение накопленной перемотки одним вызовом set_time"""
+        seconds, self._pending_seek = self._pending_seek, 0
+        if seconds and self.player and self.player.get_media():
             current_time = self.player.get_time() // 1000  # мс -> сек
-            self.player.set_time((current_time + seconds) * 1000)
+            self.player.set_time(max(0, current_time + seconds) * 1000)
 
     def toggle_repeat(self):
         """Переключение повтора"""
         self.repeat = not self.repeat
 
+    def set_playlist(self, files):
+        """Установка плейлиста"""
+        self.playlist = files
+        self.order = list(range(len(files)))
+        self.current_index = 0
+        if self.shuffle:
+            random.shuffle(self.order)
+
+    def _start_round(self, track):
+        """Перенос трека в начало порядка: круг перемешки пройдет все треки по разу"""
+        pos = self.order.index(track)
+        self.order[0], self.order[pos] = self.order[pos], self.order[0]
+        self.current_index = 0
+
+    def select(self, track):
+        """Выбор трека по индексу в playlist: воспроизведение продолжится с него"""
+        if self.shuffle:
+            self._start_round(track)
+        else:
+            self.current_index = self.order.index(track)
+        return self.playlist[track]
+
     def toggle_shuffle(self):
-        """Переключение перемешки"""
+        """Переключение перемешки (переставляются только индексы)"""
         self.shuffle = not self.shuffle
+        track = self.order[self.current_index] if self.order else None
         if self.shuffle:
-            random.shuffle(self.playlist)
+            random.shuffle(self.order)
+            if track is not None:
+                self._start_round(track)
         else:
-            self.playlist.sort()
+            self.order = list(range(len(self.playlist)))
+            if track is not None:
+                self.current_index = track
+
+    def _reshuffle(self):
+        """Новый круг перемешки без повтора последнего трека"""
+        last = self.order[-1]
+        random.shuffle(self.order)
+        if len(self.order) > 1 and self.order[0] == last:
+            swap = random.randrange(1, len(self.order))
+            self.order[0], self.order[swap] = self.order[swap], self.order[0]
+
+    def next_file(self):
+        """Переход к следующему треку без загрузки (None, если плейлист пуст)"""
+        if not self.order:
+            return None
+        self.current_index = (self.current_index + 1) % len(self.order)
+        if self.shuffle and self.current_index == 0:
+            self._reshuffle()
+        return self.playlist[self.order[self.current_index]]
+
+    def previous_file(self):
+        """Переход к предыдущему треку без загрузки (None, если плейлист пуст)"""
+        if not self.order:
+            return None
+        self.current_index = (self.current_index - 1) % len(self.order)
+        return self.playlist[self.order[self.current_index]]
 
     def next_track(self):
         """Следующий трек"""
-        if self.playlist:
-            self.current_index = (self.current_index + 1) % len(self.playlist)
-            self.load(self.playlist[self.current_index])
+        filename = self.next_file()
+        if filename and self.load(filename):
             self.play()
 
     def previous_track(self):
         """Предыдущий трек"""
-        if self.playlist:
-            self.current_index = (self.current_index - 1) % len(self.playlist)
-            self.load(self.playlist[self.current_index])
+        filename = self.previous_file()
+        if filename and self.load(filename):
             self.play()
 
+AUDIO_EXTS = ('.mp3', '.wav', '.flac', '.m4a', '.aac')
+AUDIO_EXTS_SET = frozenset(ext[1:] for ext in AUDIO_EXTS)
+
+@functools.lru_cache(maxsize=4096)
+def _is_audio(name):
+    """Проверка расширения аудиофайла (результат кэшируется по имени)"""
+    _, dot, ext = name.rpartition('.')
+    return bool(dot) and ext.lower() in AUDIO_EXTS_SET
+
+def scan_audio_files(directory):
+    """Сканирование папки на аудиофайлы (поддерживает M4A, MP3 и др.)"""
+    # scandir отдает тип файла вместе с записью каталога, без лишнего stat
+    with os.scandir(directory) as it:
+        files = [
+            e.path
+            for e in it
+            if _is_audio(e.name) and e.is_file()
+        ]
+    # Сортируем один раз при сканировании; результат хранится в кэше
+    files.sort()
+    return files
+
+class AudioFilesCache:
+    """Кэш списков аудиофайлов по времени изменения папки"""
+    def __init__(self):
+        self._entries = {}  # папка -> (st_mtime_ns, список файлов)
+
+    def get(self, directory):
+        """Список файлов из кэша или повторное сканирование, если папка изменилась"""
+        mtime = os.stat(directory).st_mtime_ns
+        cached = self._entries.get(directory)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, scan_audio_files(directory))
+            self._entries[directory] = cached
+        return cached[1]
+
+_audio_files_cache = AudioFilesCache()
+
 def get_audio_files(directory):
-    """Получение списка аудиофайлов (поддерживает M4A, MP3 и др.)"""
-    extensions = ('.mp3', '.wav', '.flac', '.m4a', '.aac')
-    return [
-        os.path.join(directory, f) 
-        for f in os.listdir(directory) 
-        if f.lower().endswith(extensions) and os.path.isfile(os.path.join(directory, f))
-    ]
+    """Получение списка аудиофайлов (повторные вызовы берутся из кэша)"""
+    return _audio_files_cache.get(directory)
+
+class FileRow(urwid.WidgetWrap):
+    """Строка списка файлов: легче, чем Button внутри AttrMap"""
+    def __init__(self, label, on_select):
+        self.label = label
+        self._on_select = on_select
+        super().__init__(urwid.AttrMap(urwid.SelectableIcon(label, 0), None, 'focus'))
+
+    def selectable(self):
+        return True
+
+    def keypress(self, size, key):
+        """Выбор файла клавишами Enter/Пробел"""
+        if key in ('enter', ' '):
+            self._on_select(self)
+            return None
+        return key
+
+    def mouse_event(self, size, event, button, col, row, focus):
+        """Выбор файла щелчком мыши"""
+        if button != 1 or not urwid.util.is_mouse_press(event):
+            return False
+        self._on_select(self)
+        return True
+
+class LazyFileWalker(urwid.ListWalker):
+    """Список файлов, строки которого создаются по мере прокрутки"""
+    keep_radius = 256  # строки ближе к фокусу не вытесняются (больше высоты экрана)
+    cache_size = 1024  # при превышении удаляются строки дальше keep_radius
+
+    def __init__(self, labels, on_select):
+        self._labels = labels
+        self._on_select = on_select
+        self._rows = {}  # позиция -> FileRow
+        self._focus = 0
+
+    def _row(self, position):
+        """Строка из кэша или новая"""
+        row = self._rows.get(position)
+        if row is None:
+            row = FileRow(self._labels[position], self._on_select)
+            self._rows[position] = row
+            if len(self._rows) > self.cache_size:
+                self._evict()
+        return row
+
+    def _evict(self):
+        """Удаление строк, далеких от фокуса: видимые строки всегда остаются"""
+        self._rows = {
+            position: row for position, row in self._rows.items()
+            if abs(position - self._focus) <= self.keep_radius
+        }
+
+    def get_focus(self):
+        if not self._labels:
+            return None, None
+        return self._row(self._focus), self._focus
+
+    def set_focus(self, position):
+        self._focus = position
+        self._modified()
+
+    def get_next(self, position):
+        position += 1
+        if position >= len(self._labels):
+            return None, None
+        return self._row(position), position
+
+    def get_prev(self, position):
+        position -= 1
+        if position < 0:
+            return None, None
+        return self._row(position), position
+
+    def positions(self, reverse=False):
+        if reverse:
+            return range(len(self._labels) - 1, -1, -1)
+        return range(len(self._labels))
 
 class AudioPlayerUI:
     """Пользовательский интерфейс"""
@@ -104,25 +330,30 @@ class AudioPlayerUI:
         ('button', 'black', 'light gray'),
         ('focus', 'white', 'dark red'),
     ]
+    tick_interval = 0.5  # период обновления статуса (сек)
+    seek_delay = 0.1  # за это время нажатия перемотки объединяются (сек)
 
     def __init__(self, directory='.'):
         self.directory = directory
         self.player = AudioPlayer()
-        self.player.playlist = get_audio_files(self.directory)
+        self.player.set_playlist(get_audio_files(self.directory))
+        self._seek_alarm = None
+        # asyncio ждет ввода через select/epoll вместо постоянного опроса
+        self.aloop = asyncio.new_event_loop()
+        # Один поток: загрузки выполняются по очереди и не мешают друг другу
+        self._loader = ThreadPoolExecutor(max_workers=1)
+        self._pending_load = None
         self.create_widgets()
         self.update_status()
 
     def create_widgets(self):
         """Создание элементов интерфейса"""
-        # Список файлов
+        # Список файлов (строится из уже загруженного плейлиста)
+        self._label_to_track = {
+            os.path.basename(f): i for i, f in enumerate(self.player.playlist)
+        }
         self.file_list = urwid.ListBox(
-            urwid.SimpleFocusListWalker([
-                urwid.AttrMap(
-                    urwid.Button(f, self.on_file_select),
-                    None, 'focus'
-                ) for f in os.listdir(self.directory) 
-                if f.lower().endswith(('.mp3', '.wav', '.flac', '.m4a', '.aac'))
-            ])
+            LazyFileWalker(list(self._label_to_track), self.on_file_select)
         )
 
         # Кнопки управления
@@ -144,6 +375,7 @@ class AudioPlayerUI:
 
         # Статусная строка
         self.status = urwid.Text(('header', " Статус: Остановлено | Громкость: 50% "), align='center')
+        self._last_status_text = None
 
         # Основной макет
         self.layout = urwid.Frame(
@@ -167,17 +399,36 @@ class AudioPlayerUI:
             status.append("⏹ Остановлено")
         
         if self.player.current_file:
-            status.append(f"📁: {os.path.basename(self.player.current_file)}")
+            status.append(f"📁: {self.player.current_basename}")
         
         status.append(f"🔊: {self.player.volume}%")
-        self.status.set_text(('header', " | ".join(status)))
+        text = " | ".join(status)
+        # Перерисовка нужна, только если текст изменился
+        if text != self._last_status_text:
+            self._last_status_text = text
+            self.status.set_text(('header', text))
 
     def on_file_select(self, button):
         """Выбор файла"""
-        filename = os.path.join(self.directory, button.label)
-        if self.player.load(filename):
+        self._load_async(self.player.select(self._label_to_track[button.label]))
+
+    def _load_async(self, filename):
+        """Загрузка и запуск файла; все загрузки идут через один фоновый поток"""
+        # Открытие файла в VLC может блокировать, поэтому выполняется вне UI
+        future = self.aloop.run_in_executor(self._loader, self.player.load, filename)
+        self._pending_load = future
+        future.add_done_callback(self._on_file_loaded)
+
+    def _on_file_loaded(self, future):
+        """Запуск воспроизведения после фоновой загрузки"""
+        # Устаревшие загрузки пропускаем: играет только последний запрошенный файл
+        if future is not self._pending_load:
+            return
+        self._pending_load = None
+        if future.result():
             self.player.play()
             self.update_status()
+            self.loop.draw_screen()
 
     def on_play_pause(self, button):
         """Управление воспроизведением"""
@@ -205,22 +456,47 @@ class AudioPlayerUI:
 
     def on_volume_up(self, button):
         """Увеличить громкость"""
-        self.player.set_volume(self.player.volume + 10)
-        self.update_status()
+        if self.player.set_volume(self.player.volume + 10):
+            self.update_status()
 
     def on_volume_down(self, button):
         """Уменьшить громкость"""
-        self.player.set_volume(self.player.volume - 10)
-        self.update_status()
+        if self.player.set_volume(self.player.volume - 10):
+            self.update_status()
 
     def run(self):
         """Запуск приложения"""
-        loop = urwid.MainLoop(
+        self.loop = urwid.MainLoop(
             self.layout,
             self.palette,
-            unhandled_input=self.handle_input
+            unhandled_input=self.handle_input,
+            event_loop=urwid.AsyncioEventLoop(loop=self.aloop)
         )
-        loop.run()
+        self.loop.set_alarm_in(self.tick_interval, self._tick)
+        try:
+            self.loop.run()
+        finally:
+            self._loader.shutdown(wait=False, cancel_futures=True)
+            self.aloop.close()
+
+    def _tick(self, loop, user_data=None):
+        """Периодическое обновление статуса"""
+        filename = self.player.poll_events()
+        if filename:
+            self._load_async(filename)
+        self.update_status()
+        loop.set_alarm_in(self.tick_interval, self._tick)
+
+    def on_seek(self, seconds):
+        """Перемотка: удержание стрелки дает один set_time за seek_delay"""
+        self.player.seek(seconds)
+        if self._seek_alarm is None:
+            self._seek_alarm = self.loop.set_alarm_in(self.seek_delay, self._apply_seek)
+
+    def _apply_seek(self, loop, user_data=None):
+        """Применение накопленной перемотки"""
+        self._seek_alarm = None
+        self.player.apply_seek()
 
     def handle_input(self, key):
         """Обработка клавиш"""
@@ -231,9 +507,9 @@ class AudioPlayerUI:
         elif key in ('s', 'S'):
             self.on_stop(None)
         elif key == 'left':
-            self.player.seek(-10)
+            self.on_seek(-10)
         elif key == 'right':
-            self.player.seek(10)
+            self.on_seek(10)
         elif key == '+':
             self.on_volume_up(None)
         elif key == '-':